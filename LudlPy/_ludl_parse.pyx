@@ -0,0 +1,79 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+
+cdef enum:
+    _COLON = 58
+    _ACK = 65
+    _SPACE = 32
+    _MINUS = 45
+    _ZERO = 48
+    _NINE = 57
+    _CR = 13
+    _LF = 10
+    # More digits than this may not fit in a long long, such replies are left to the general parser
+    _MAX_DIGITS = 18
+
+
+cpdef object parse_int_response(const unsigned char[:] response, Py_ssize_t start, Py_ssize_t end,
+                                Py_ssize_t argument_count):
+    """
+    Parse an acknowledged reply containing only integer arguments, e.g. ":A 100 -200 \\r\\n".
+
+    :param response: The buffer holding the reply
+    :param start: The index the reply starts at within response
+    :param end: The index the reply ends at within response
+    :param argument_count: The number of integers expected in the reply
+    :return: The list of integers, or None if the reply is anything else so that the caller can fall back to the
+    general parser.
+    """
+    cdef list arguments
+    cdef Py_ssize_t index = start + 3
+    cdef Py_ssize_t found_count = 0
+    cdef Py_ssize_t digit_count
+    cdef long long value
+    cdef bint negative
+    cdef unsigned char character
+
+    if end - start < 3 or response[start] != _COLON or response[start + 1] != _ACK or response[start + 2] != _SPACE:
+        return None
+
+    arguments = [0]*argument_count
+
+    # Every argument must be an optionally negative run of digits followed by a single space
+    while found_count < argument_count:
+        negative = False
+        digit_count = 0
+        value = 0
+
+        if index < end and response[index] == _MINUS:
+            negative = True
+            index += 1
+
+        while index < end:
+            character = response[index]
+
+            if character < _ZERO or character > _NINE:
+                break
+
+            value = value*10 + (character - _ZERO)
+            digit_count += 1
+            index += 1
+
+        if digit_count == 0 or digit_count > _MAX_DIGITS or index >= end or response[index] != _SPACE:
+            return None
+
+        arguments[found_count] = -value if negative else value
+        found_count += 1
+        index += 1
+
+    # The pure Python parser drops whatever follows the last space, so the rest of the reply must be the line ending
+    # and must not contain another space
+    if index >= end or (response[index] != _CR and response[index] != _LF):
+        return None
+
+    while index < end:
+        if response[index] == _SPACE:
+            return None
+
+        index += 1
+
+    return arguments
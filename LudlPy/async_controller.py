@@ -0,0 +1,416 @@
+from collections import deque
+from collections.abc import Callable, Sequence
+import asyncio
+import concurrent.futures
+import serial
+from typing import Optional, Union
+
+try:
+    import serial_asyncio
+except ImportError:
+    # Only required when the controller is not created with threaded=True
+    serial_asyncio = None
+
+from .controller import (
+    Controller, _ACCEL_PREFIX, _LF, _MOVE_PREFIX, _MOVREL_PREFIX, _RDSTAT_PREFIX, _SPEED_PREFIX, _STATUS_COMMAND,
+    _WHERE_PREFIX, _communication_parameters, _encode_assignment, _encode_query, _int_response_types,
+    _load_cached_baudrates, _parse_response, _set_port_buffer_sizes
+)
+
+
+class _ThreadedSerialStream:
+    """
+    Presents a blocking pyserial port as an asyncio stream reader and writer.
+
+    Reads and writes each run in order on their own worker thread, so the event loop keeps running while a read waits
+    on the serial port, and a write is never stuck behind a read waiting for the reply to that write.
+    """
+
+    __slots__ = ("serial", "_read_executor", "_write_executor", "_write_exception")
+
+    def __init__(self, port_connection: serial.Serial) -> None:
+        self.serial = port_connection
+        self._read_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="ludl-read")
+        self._write_executor = concurrent.futures.ThreadPoolExecutor(max_workers=1, thread_name_prefix="ludl-write")
+        self._write_exception: Optional[BaseException] = None
+
+    def write(self, data: bytes) -> None:
+        """
+        Queue data to be written. As with asyncio.StreamWriter.write(), this does not wait for the write to finish.
+        """
+        self._write_executor.submit(self.serial.write, data).add_done_callback(self._check_write)
+
+    def _check_write(self, write_future: concurrent.futures.Future) -> None:
+        """
+        Record a failed write so that it is raised from the read waiting on its reply, which would otherwise never
+        arrive.
+        """
+        if write_future.cancelled() or write_future.exception() is None:
+            return
+
+        self._write_exception = write_future.exception()
+        self.serial.cancel_read()
+
+    async def _read(self, read_function: Callable[..., bytes], *args) -> bytes:
+        """
+        Run a blocking read on the read worker, raising the exception of any failed write instead of its result.
+        """
+        if self._write_exception is not None:
+            raise self._write_exception
+
+        data = await asyncio.get_running_loop().run_in_executor(self._read_executor, read_function, *args)
+
+        if self._write_exception is not None:
+            raise self._write_exception
+
+        return data
+
+    async def readline(self) -> bytes:
+        """
+        Read up to and including the next newline character.
+        """
+        return await self._read(self.serial.read_until, _LF)
+
+    async def readexactly(self, n: int) -> bytes:
+        """
+        Read exactly n bytes.
+        """
+        data = await self._read(self.serial.read, n)
+
+        # Only possible when a read timeout has been set in _default_communication_parameters
+        if len(data) < n:
+            raise asyncio.IncompleteReadError(data, n)
+
+        return data
+
+    def close(self) -> None:
+        """
+        Interrupt any pending read, then close the port once queued writes have finished and stop the worker threads.
+        """
+        self.serial.cancel_read()
+        self._write_executor.shutdown(wait=False)
+        self._read_executor.submit(self._close_port)
+        self._read_executor.shutdown(wait=False)
+
+    def _close_port(self) -> None:
+        """
+        Close the port after the writes already queued.
+        """
+        self._write_executor.shutdown(wait=True)
+        self.serial.close()
+
+
+class BatchingCommandQueue:
+    """
+    Coalesces the commands issued during one pass of the event loop into a single write.
+
+    Replies are read back in the order the commands were written and delivered to the future returned by enqueue().
+    """
+
+    __slots__ = ("reader", "writer", "_write", "_pending", "_awaiting", "_flush_handle", "_reader_task")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.reader = reader
+        self.writer = writer
+        self._write = writer.write
+        # Commands waiting for the next flush, and written commands waiting for their reply
+        self._pending: list[tuple[bytes, Optional[Sequence[str]], bool, asyncio.Future]] = []
+        self._awaiting: deque[tuple[Optional[Sequence[str]], bool, asyncio.Future]] = deque()
+        self._flush_handle: Optional[asyncio.Handle] = None
+        self._reader_task: Optional[asyncio.Task] = None
+
+    def enqueue(self, command: bytes, response_types: Optional[Sequence[str]] = None,
+                response_has_newline: bool = True, barrier: bool = False) -> asyncio.Future:
+        """
+        Queue a command to be written with the next flush.
+
+        :param command: The formatted command, including its trailing carriage return.
+        :param response_types: See Controller.await_response()
+        :param response_has_newline: See Controller.await_response()
+        :param barrier: Flush immediately instead of waiting for other commands to join the batch.
+        :return: A future resolving to the response of the command.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        self._pending.append((command, response_types, response_has_newline, future))
+
+        if barrier:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_soon(self._flush)
+
+        return future
+
+    def _flush(self) -> None:
+        """
+        Write every pending command in one frame and make sure their replies are being read.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if not self._pending:
+            return
+
+        # Taken off the queue before writing, so that a failed write is not repeated by the next flush
+        batch = self._pending
+        self._pending = []
+
+        try:
+            self._write(b"".join(command for command, _, _, _ in batch))
+        except Exception as exception:
+            # Raising here would only reach the event loop's exception handler when called by call_soon()
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exception)
+            return
+
+        # Only written commands are waited on, a reply is never read for a command still in _pending
+        self._awaiting.extend(
+            (response_types, response_has_newline, future) for _, response_types, response_has_newline, future in batch
+        )
+
+        if self._reader_task is None or self._reader_task.done():
+            self._reader_task = asyncio.create_task(self._read_replies())
+
+    async def _read_replies(self) -> None:
+        """
+        Read replies until every written command has received one.
+        """
+        while self._awaiting:
+            response_types, response_has_newline, future = self._awaiting[0]
+
+            try:
+                response = await self.await_response(response_types, response_has_newline)
+            except Exception as exception:
+                # The stream is out of step with the commands written, so fail everything already written.
+                # Commands still in _pending are unaffected and get their own replies once flushed.
+                while self._awaiting:
+                    _, _, future = self._awaiting.popleft()
+                    if not future.done():
+                        future.set_exception(exception)
+                return
+
+            self._awaiting.popleft()
+
+            if not future.done():
+                future.set_result(response)
+
+    async def await_response(self, response_types: Optional[Sequence[str]] = None,
+                             response_has_newline: bool = True) -> Union[tuple[bool, Optional[list]], str]:
+        """
+        See Controller.await_response()
+        """
+        if not response_has_newline:
+            response = await self.reader.readexactly(1)
+        else:
+            response = await self.reader.readline()
+
+        return _parse_response(response, response_types, response_has_newline)
+
+    def close(self) -> None:
+        """
+        Close the underlying serial connection. Commands still waiting to be written or for their reply fail with a
+        ConnectionError.
+        """
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        if self._reader_task is not None:
+            self._reader_task.cancel()
+            self._reader_task = None
+
+        futures = [future for _, _, _, future in self._pending] + [future for _, _, future in self._awaiting]
+        self._pending.clear()
+        self._awaiting.clear()
+
+        for future in futures:
+            if not future.done():
+                future.set_exception(ConnectionError("The connection to the controller was closed"))
+
+        self.writer.close()
+
+
+class AsyncController:
+    """
+    An asyncio version of Controller.
+
+    Replies are awaited on the event loop instead of polling the serial port, so waiting on a move does not occupy
+    the CPU and several controllers can be driven concurrently from a single thread.
+    Commands issued concurrently are batched into a single write by a BatchingCommandQueue.
+    Instances must be created with the AsyncController.create() coroutine.
+    """
+
+    __slots__ = ("command_queue",)
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.command_queue = BatchingCommandQueue(reader, writer)
+
+    @classmethod
+    async def create(cls, serial_port_name: str, baudrate: Optional[int] = None,
+                     threaded: bool = False) -> "AsyncController":
+        """
+        :param serial_port_name: The name of the COM port to be used. Acceptable names include "COM2", "COM3", etc.
+        :param baudrate: See Controller.__init__()
+        :param threaded: Use a regular pyserial port whose blocking reads and writes run on a worker thread, instead of
+        serial_asyncio. This does not require pyserial-asyncio, which does not support every platform's event loop.
+        :return: The connected controller.
+        """
+        if baudrate is None and serial_port_name in _load_cached_baudrates():
+            # Locate the rate an earlier negotiation left the controller at. The blocking probes run on a worker
+            # thread, and the port is closed again before being reopened below.
+            locating_controller = await asyncio.get_running_loop().run_in_executor(None, Controller, serial_port_name)
+            baudrate = locating_controller.stage_port.baudrate
+            locating_controller.stage_port.close()
+
+        if threaded:
+            stream = _ThreadedSerialStream(Controller._register_port(serial_port_name, baudrate))
+
+            return cls(stream, stream)
+
+        if serial_asyncio is None:
+            raise ImportError("pyserial-asyncio is required to create an AsyncController unless threaded=True")
+
+        reader, writer = await serial_asyncio.open_serial_connection(
+            url=serial_port_name, **_communication_parameters(baudrate)
+        )
+        _set_port_buffer_sizes(writer.transport.serial)
+
+        return cls(reader, writer)
+
+    def close(self) -> None:
+        """
+        Close the underlying serial connection.
+        """
+        self.command_queue.close()
+
+    async def send_check(self, motor_id: str = "X") -> tuple[bool, Optional[list]]:
+        """
+        See Controller.send_check()
+        """
+        return await self.command_queue.enqueue(_encode_query(_RDSTAT_PREFIX, (motor_id,)))
+
+    async def get_speed(self, motor_ids: Sequence[str]) -> tuple[bool, Optional[list[int]]]:
+        """
+        See Controller.get_speed()
+        """
+        command = _encode_query(_SPEED_PREFIX, tuple(motor_ids))
+        response_types = _int_response_types(len(motor_ids))
+
+        return await self.command_queue.enqueue(command, response_types)
+
+    async def set_speed(self, motor_id_speed_dictionary: dict[str, int]) -> tuple[bool, Optional[list]]:
+        """
+        See Controller.set_speed()
+        """
+        command = _encode_assignment(_SPEED_PREFIX, tuple(motor_id_speed_dictionary.items()))
+
+        return await self.command_queue.enqueue(command)
+
+    async def get_acceleration(self, motor_ids: Sequence[str]) -> tuple[bool, Optional[list[int]]]:
+        """
+        See Controller.get_acceleration()
+        """
+        command = _encode_query(_ACCEL_PREFIX, tuple(motor_ids))
+        response_types = _int_response_types(len(motor_ids))
+
+        return await self.command_queue.enqueue(command, response_types)
+
+    async def set_acceleration(self, motor_id_acceleration_dictionary: dict[str, int]) -> tuple[bool, Optional[list]]:
+        """
+        See Controller.set_acceleration()
+        """
+        command = _encode_assignment(_ACCEL_PREFIX, tuple(motor_id_acceleration_dictionary.items()))
+
+        return await self.command_queue.enqueue(command)
+
+    async def get_absolute_position(self, motor_ids: Sequence[str]) -> tuple[bool, list[int]]:
+        """
+        See Controller.get_absolute_position()
+        """
+        command = _encode_query(_WHERE_PREFIX, tuple(motor_ids))
+        response_types = _int_response_types(len(motor_ids))
+
+        # The position is a snapshot, so it is written straight away along with anything queued before it
+        return await self.command_queue.enqueue(command, response_types, barrier=True)
+
+    async def get_state(self, motor_ids: Sequence[str]) -> tuple[bool, dict[str, list[int]]]:
+        """
+        See Controller.get_state()
+        """
+        # The position query is a barrier, so all three queries are flushed in one write
+        (speed_successful, speeds), (acceleration_successful, accelerations), (position_successful, positions) = \
+            await asyncio.gather(
+                self.get_speed(motor_ids), self.get_acceleration(motor_ids), self.get_absolute_position(motor_ids)
+            )
+
+        executed_successfully = speed_successful and acceleration_successful and position_successful
+
+        return executed_successfully, {"speed": speeds, "accel": accelerations, "pos": positions}
+
+    async def _start_move(self, command: bytes) -> tuple[bool, Optional[asyncio.Task]]:
+        """
+        Send a move command and start waiting for the motors in the background.
+
+        :param command: The formatted move command
+        :return: A bool indicating whether execution was successful, as well as a task which completes when the motors
+        are ready to receive commands again. The task is None if the move was not accepted.
+        """
+        executed_successfully, _ = await self.command_queue.enqueue(command)
+
+        if not executed_successfully:
+            return False, None
+
+        return True, asyncio.create_task(self.await_motors_ready())
+
+    async def move_absolute(self, motor_id_position_dictionary: dict[str, int]) \
+            -> tuple[bool, Optional[asyncio.Task]]:
+        """
+        Move to the given coordinates in the absolute frame. Unlike Controller.move_absolute(), this returns once the
+        move has been accepted, along with a task tracking the motion. Other work, such as preparing an acquisition,
+        can run while the stage moves, e.g. await asyncio.gather(motion_task, prepare_camera()).
+
+        :param motor_id_position_dictionary: A dictionary containing id - coordinate pairs.
+        :return: See _start_move()
+        """
+        return await self._start_move(_encode_assignment(_MOVE_PREFIX, tuple(motor_id_position_dictionary.items())))
+
+    async def move_relative(self, motor_id_position_dictionary: dict[str, int]) \
+            -> tuple[bool, Optional[asyncio.Task]]:
+        """
+        Move to a given position relative to the current position. See move_absolute()
+
+        :param motor_id_position_dictionary: A dictionary containing id - coordinate pairs.
+        :return: See _start_move()
+        """
+        return await self._start_move(_encode_assignment(_MOVREL_PREFIX, tuple(motor_id_position_dictionary.items())))
+
+    async def check_motor_status(self) -> str:
+        """
+        See Controller.check_motor_status()
+        """
+        return await self.command_queue.enqueue(
+            _STATUS_COMMAND, response_has_newline=False, barrier=True
+        )
+
+    async def await_motors_ready(self, initial_poll_interval: float = 0.005, max_poll_interval: float = 0.1) -> None:
+        """
+        Returns when both motors are ready to receive commands.
+        The interval between status checks doubles while the motors are busy so that long moves do not flood the
+        serial line.
+
+        :param initial_poll_interval: The number of seconds to wait after the first busy status
+        :param max_poll_interval: The maximum number of seconds to wait between status checks
+        """
+        poll_interval = initial_poll_interval
+
+        while True:
+            response = await self.check_motor_status()
+
+            if response == "N":
+                return
+
+            await asyncio.sleep(poll_interval)
+            poll_interval = min(poll_interval*2, max_poll_interval)
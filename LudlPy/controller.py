@@ -2,8 +2,18 @@
 # 8/8/22
 
 from collections.abc import Sequence
+import functools
+import json
+import os
 import serial
-from typing import Optional, Union
+import time
+from typing import Final, Optional, Union
+
+try:
+    from ._ludl_parse import parse_int_response as _parse_int_response
+except ImportError:
+    # The compiled parser is optional, replies are parsed in Python when it has not been built
+    _parse_int_response = None
 
 
 _default_communication_parameters = {
@@ -12,106 +22,454 @@ _default_communication_parameters = {
     "bytesize": serial.EIGHTBITS,
     "parity": serial.PARITY_NONE,
     "stopbits": serial.STOPBITS_TWO,
+    "timeout": None,  # Reads block until the controller replies
+    "exclusive": True,  # Stop other processes from interleaving their own commands and reads
 }
 
+_PORT_BUFFER_SIZE: Final[int] = 1 << 16
+
+# Baud rates tried when negotiating a faster connection, see Controller._negotiate_baudrate()
+_probe_baudrates = (9600, 19200, 57600, 115200)
+_probe_timeout = 0.5
+_baudrate_cache_path = os.path.join(os.path.expanduser("~"), ".ludlpy_baud")
+
 _cast_functions = {
     "float": float,
     "int": int,
-    "string": str
+    "string": lambda response_argument: response_argument.decode("ASCII")
 }
 
+_int_response_types_by_count: dict[int, tuple[str, ...]] = {}
+
+
+_CR: Final[bytes] = b"\r"
+_RDSTAT_PREFIX: Final[bytes] = b"RDSTAT "
+_SPEED_PREFIX: Final[bytes] = b"SPEED "
+_ACCEL_PREFIX: Final[bytes] = b"ACCEL "
+_WHERE_PREFIX: Final[bytes] = b"WHERE "
+_MOVE_PREFIX: Final[bytes] = b"MOVE "
+_MOVREL_PREFIX: Final[bytes] = b"MOVREL "
+_BAUD_PREFIX: Final[bytes] = b"BAUD "
+_STATUS_COMMAND: Final[bytes] = b"STATUS\r"
+
+_LF: Final[bytes] = b"\n"
+_ACK_HEADER: Final[int] = 0x413A  # ":A" read as a little-endian 16 bit integer
+_NAK_HEADER: Final[int] = 0x4E3A  # ":N" read as a little-endian 16 bit integer
+
+
+def _frame(prefix: bytes, *parts: bytes) -> bytes:
+    """
+    Build a command the controller can read from a pre-encoded prefix and arguments.
+    The arguments are separated by spaces and the command is terminated with a carriage return.
+
+    :param prefix: The ASCII encoded command name, including its trailing space.
+    :param parts: The ASCII encoded command arguments.
+    :return: The binary command string in ASCII formatting.
+    """
+    return prefix + b" ".join(parts) + _CR
+
+
+@functools.lru_cache(maxsize=256)
+def _encode_query(prefix: bytes, motor_ids: tuple[str, ...]) -> bytes:
+    """
+    Build a command reading from motors, such as "WHERE X Y".
+    Scripts tend to use the same few motor combinations, so each combination is only encoded once.
+
+    :param prefix: The ASCII encoded command name, including its trailing space.
+    :param motor_ids: The motors the command addresses.
+    :return: The binary command string in ASCII formatting.
+    """
+    return _frame(prefix, *[motor_id.encode("ASCII") for motor_id in motor_ids])
+
+
+@functools.lru_cache(maxsize=4096, typed=True)
+def _encode_pair(motor_id: str, value: int) -> bytes:
+    """
+    Encode an id - value argument such as "X = 100". Cached since scans tend to revisit the same values.
+    The cache is typed so that e.g. 100 and 100.0, which compare equal but format differently, get separate entries.
+
+    :param motor_id: The motor the value applies to
+    :param value: The value to assign
+    :return: The ASCII encoded argument
+    """
+    return f"{motor_id} = {value}".encode("ASCII")
+
+
+def _encode_assignment(prefix: bytes, motor_id_values: tuple[tuple[str, int], ...]) -> bytes:
+    """
+    Build a command assigning values to motors, such as "MOVE X = 100 Y = 200".
+    The whole command is cached so that repeated moves, e.g. the points of a raster scan, reuse the same bytes.
+
+    :param prefix: The ASCII encoded command name, including its trailing space.
+    :param motor_id_values: The id - value pairs, in the order they are sent to the controller.
+    :return: The binary command string in ASCII formatting.
+    """
+    # lru_cache(typed=True) only checks the types of the top level arguments, so the value types are passed separately
+    return _encode_typed_assignment(prefix, motor_id_values, tuple([type(value) for _, value in motor_id_values]))
+
+
+@functools.lru_cache(maxsize=4096)
+def _encode_typed_assignment(prefix: bytes, motor_id_values: tuple[tuple[str, int], ...],
+                             value_types: tuple[type, ...]) -> bytes:
+    """
+    Cached implementation of _encode_assignment().
+
+    :param prefix: The ASCII encoded command name, including its trailing space.
+    :param motor_id_values: The id - value pairs, in the order they are sent to the controller.
+    :param value_types: The type of each value, so that equal values of different types are cached separately.
+    :return: The binary command string in ASCII formatting.
+    """
+    return _frame(prefix, *[_encode_pair(motor_id, value) for motor_id, value in motor_id_values])
+
+
+def _int_response_types(response_count: int) -> tuple[str, ...]:
+    """
+    Return a shared ("int", ...) response type sequence so that _format_response() can recognise it by identity.
+
+    :param response_count: The number of integers in the response
+    :return: The interned response types
+    """
+    response_types = _int_response_types_by_count.get(response_count)
+
+    if response_types is None:
+        response_types = _int_response_types_by_count[response_count] = ("int",)*response_count
+
+    return response_types
+
+
+def _format_response(response_arguments: list[bytes], response_types: Sequence[str]):
+    """
+    :param response_arguments: The response from the controller in list format
+    :param response_types: The types to cast the response_arguments to
+    :return: The formatted array
+    """
+    assert len(response_arguments) == len(response_types), \
+        "Response types must be equal in length to response arguments"
+
+    # Integer reads such as speeds and positions skip the per-argument type lookup
+    if response_types is _int_response_types_by_count.get(len(response_types)):
+        return list(map(int, response_arguments))
+
+    return [
+        _cast_functions[response_type](response_argument)
+        for response_argument, response_type in zip(response_arguments, response_types)
+    ]
+
+
+def _parse_response(response: Union[bytes, bytearray], response_types: Optional[Sequence[str]] = None,
+                    response_has_newline: bool = True, start: int = 0, end: Optional[int] = None) \
+        -> Union[tuple[bool, Optional[list]], str]:
+    """
+    Parse a raw reply read from the controller.
+
+    :param response: The raw bytes read from the serial port.
+    :param response_types: See Controller.await_response()
+    :param response_has_newline: See Controller.await_response()
+    :param start: The index the reply starts at within response.
+    :param end: The index the reply ends at within response. Defaults to the end of response.
+    :return: See Controller.await_response()
+    """
+    if end is None:
+        end = len(response)
+
+    # Some commands return a single character response.
+    # These commands do not end with a newline and do not contain a reply character.
+    if not response_has_newline:
+        return response[start:end].decode("ASCII")
+
+    if _parse_int_response is not None and response_types \
+            and response_types is _int_response_types_by_count.get(len(response_types)):
+        response_array = _parse_int_response(response, start, end, len(response_types))
+
+        if response_array is not None:
+            return True, response_array
+
+    # The two byte reply character is compared as a single little-endian integer
+    reply_header = response[start] | response[start + 1] << 8 if end - start >= 2 else None
+
+    if reply_header == _ACK_HEADER:
+        executed_successfully = True
+    elif reply_header == _NAK_HEADER:
+        executed_successfully = False
+    else:
+        raise Exception(f"Unknown reply character: {response[start:start + 2].decode('ASCII', 'replace')}")
+
+    # Split the arguments straight out of the received bytes, starting after the reply character and its trailing
+    # space. The last piece holds the newline character at the end of the reply and is dropped.
+    response_array = response[start + 3:end].split(b" ")[:-1]
+
+    if executed_successfully and response_types:
+        response_array = _format_response(response_array, response_types)
+    else:
+        response_array = [response_argument.decode("ASCII") for response_argument in response_array]
+
+    return executed_successfully, response_array
+
+
+def _communication_parameters(baudrate: Optional[int] = None) -> dict:
+    """
+    :param baudrate: The baud rate to use in place of the default one.
+    :return: The keyword arguments used to open the serial port.
+    """
+    if baudrate is None:
+        return _default_communication_parameters
+
+    return {**_default_communication_parameters, "baudrate": baudrate}
+
+
+def _set_port_buffer_sizes(port_connection: serial.Serial) -> None:
+    """
+    Enlarge the driver's receive and transmit buffers so that replies are delivered in fewer, larger reads.
+    Only the Windows backend of pyserial supports this, other platforms are left unchanged.
+
+    :param port_connection: The opened serial port.
+    """
+    if hasattr(port_connection, "set_buffer_size"):
+        port_connection.set_buffer_size(rx_size=_PORT_BUFFER_SIZE, tx_size=_PORT_BUFFER_SIZE)
+
+
+def _load_cached_baudrates() -> dict[str, int]:
+    """
+    :return: The baud rates previously negotiated for each port, see Controller._negotiate_baudrate()
+    """
+    try:
+        with open(_baudrate_cache_path) as cache_file:
+            return json.load(cache_file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cached_baudrate(serial_port_name: str, baudrate: int) -> None:
+    """
+    Remember the baud rate negotiated for a port. Failing to write the cache only means probing again next time.
+
+    :param serial_port_name: The name of the COM port
+    :param baudrate: The baud rate the controller on that port is using
+    """
+    cached_baudrates = _load_cached_baudrates()
+    cached_baudrates[serial_port_name] = baudrate
+
+    try:
+        with open(_baudrate_cache_path, "w") as cache_file:
+            json.dump(cached_baudrates, cache_file)
+    except OSError:
+        pass
+
 
 class Controller:
-    def __init__(self, serial_port_name: str) -> None:
-        self.stage_port = self._register_port(serial_port_name)
+    __slots__ = ("stage_port", "_write", "_readinto", "_rx_buf", "_rx_start", "_rx_end")
+
+    def __init__(self, serial_port_name: str, baudrate: Optional[int] = None, target_baud: Optional[int] = None) \
+            -> None:
+        """
+        :param serial_port_name: See _register_port()
+        :param baudrate: See _register_port(). If not given and a baud rate was negotiated on this port before, the
+        controller's current rate is located instead, see _negotiate_baudrate()
+        :param target_baud: If given, switch the controller to the fastest baud rate it accepts up to this one.
+        See _negotiate_baudrate()
+        """
+        self.stage_port = self._register_port(serial_port_name, baudrate)
+
+        # Bound once since they are called for every command
+        self._write = self.stage_port.write
+        self._readinto = self.stage_port.readinto
+
+        # Replies are received into one reusable buffer. Bytes between _rx_start and _rx_end have been received but
+        # not yet returned as part of a reply.
+        self._rx_buf = bytearray(256)
+        self._rx_start = 0
+        self._rx_end = 0
+
+        # A controller left at a faster rate by an earlier negotiation would not answer at the default one
+        if target_baud is not None or (baudrate is None and serial_port_name in _load_cached_baudrates()):
+            self._negotiate_baudrate(serial_port_name, target_baud)
 
     @staticmethod
-    def _register_port(serial_port_name: str) -> serial.Serial:
+    def _register_port(serial_port_name: str, baudrate: Optional[int] = None) -> serial.Serial:
         """
 
         :param serial_port_name: The name of the COM port to be used. Acceptable names include "COM2", "COM3", etc.
+        :param baudrate: The baud rate of the controller. Defaults to the one in _default_communication_parameters.
         :return: The instantiated serial object.
         """
         port_connection = serial.Serial(
-            port=serial_port_name, **_default_communication_parameters
+            port=serial_port_name, **_communication_parameters(baudrate)
         )
+        _set_port_buffer_sizes(port_connection)
 
         return port_connection
 
-    @staticmethod
-    def _format_command_string(command: str) -> bytes:
+    def _negotiate_baudrate(self, serial_port_name: str, target_baud: Optional[int] = None) -> None:
         """
-        This function is used to convert the input command into a readable format for the controller.
-        This is accomplished by adding a carriage return to the end of the command string,
-        and converting the string to binary using the ASCII standard.
+        Find the baud rate the controller is using, then move the connection to the fastest baud rate, up to
+        target_baud, that the controller accepts. Each new rate is requested with the BAUD command and kept only if the
+        controller still answers at it. The result is saved per port in ~/.ludlpy_baud so that later connections can
+        skip the probing.
+
+        :param serial_port_name: The name of the COM port, used as the cache key
+        :param target_baud: The fastest baud rate to try. If None, the connection is left at the controller's
+        current rate.
+        """
+        read_timeout = self.stage_port.timeout
+        # Replies are lost while the two ends disagree on the baud rate, so reads must not block forever
+        self.stage_port.timeout = _probe_timeout
+
+        try:
+            cached_baudrate = _load_cached_baudrates().get(serial_port_name)
+            baudrate = self._locate_baudrate(cached_baudrate)
 
-        :param command: The command string to be written to the buffer.
-        :return: The binary command string in ASCII formatting.
+            if target_baud is not None:
+                baudrate = self._switch_baudrate(baudrate, target_baud)
+
+            if baudrate != cached_baudrate:
+                _save_cached_baudrate(serial_port_name, baudrate)
+        finally:
+            self.stage_port.timeout = read_timeout
+
+    def _locate_baudrate(self, cached_baudrate: Optional[int]) -> int:
         """
-        carriage_command = f"{command}\r"
-        return carriage_command.encode("ASCII")
+        Find the baud rate the controller answers at. The controller keeps its baud rate until it is power cycled, so
+        the last negotiated one is tried first, then the one the port was opened with, then every other known rate.
 
-    @staticmethod
-    def _format_response(response_arguments: list[str], response_types: Sequence[str]):
+        :param cached_baudrate: The baud rate last negotiated on this port, if any
+        :return: The baud rate the port has been left at
         """
-        :param response_arguments: The response from the controller in list format
-        :param response_types: The types to cast the response_arguments to
-        :return: The formatted array
+        candidate_baudrates = [self.stage_port.baudrate, *_probe_baudrates]
+        if cached_baudrate is not None:
+            candidate_baudrates.insert(0, cached_baudrate)
+
+        # Duplicates are removed while keeping the order
+        candidate_baudrates = list(dict.fromkeys(candidate_baudrates))
+
+        for baudrate in candidate_baudrates:
+            if self._probe_baudrate(baudrate):
+                return baudrate
+
+        raise Exception(f"The controller did not answer at any of the baud rates {candidate_baudrates}")
+
+    def _switch_baudrate(self, current_baudrate: int, target_baud: int) -> int:
         """
-        assert len(response_arguments) == len(response_types), \
-            "Response types must be equal in length to response arguments"
+        Ask the controller to switch to the fastest baud rate it accepts up to target_baud. If it is already faster
+        than target_baud it is stepped down, otherwise rates between the current one and target_baud are tried.
 
-        formatted_response = []
+        :param current_baudrate: The baud rate the controller is answering at
+        :param target_baud: The fastest baud rate to try
+        :return: The baud rate the port has been left at
+        """
+        if current_baudrate > target_baud:
+            candidate_baudrates = [baudrate for baudrate in _probe_baudrates if baudrate <= target_baud]
+        else:
+            candidate_baudrates = [baudrate for baudrate in _probe_baudrates
+                                   if current_baudrate < baudrate <= target_baud]
+
+        for baudrate in reversed(candidate_baudrates):
+            self._write(_frame(_BAUD_PREFIX, str(baudrate).encode("ASCII")))
+
+            try:
+                accepted, _ = self.await_response()
+            except Exception:
+                # The controller may have switched before acknowledging, leaving the acknowledgement garbled or lost.
+                # Whatever part of it was received must not be read as the reply to the next command.
+                self.stage_port.reset_input_buffer()
+                self._rx_start = self._rx_end = 0
+                accepted = None
+
+            # Only a clear refusal means the controller is still at the current rate, otherwise find out which rate
+            # it answers at
+            if accepted is not False:
+                if self._probe_baudrate(baudrate):
+                    return baudrate
+
+                if not self._probe_baudrate(current_baudrate):
+                    raise Exception(f"Lost contact with the controller while switching to {baudrate} baud")
+
+        if current_baudrate > target_baud:
+            raise Exception(f"The controller did not accept any baud rate up to {target_baud}, "
+                            f"it remains at {current_baudrate} baud")
+
+        return current_baudrate
+
+    def _probe_baudrate(self, baudrate: int) -> bool:
+        """
+        Switch the port to the given baud rate and check that the controller answers.
 
-        for response_argument, response_type in zip(response_arguments, response_types):
-            formatted_response.append(_cast_functions[response_type](response_argument))
+        :param baudrate: The baud rate to try
+        :return: Whether the controller replied successfully
+        """
+        self.stage_port.baudrate = baudrate
+        self.stage_port.reset_input_buffer()
+        self._rx_start = self._rx_end = 0
 
-        return formatted_response
+        try:
+            check_successful, _ = self.send_check()
+        except Exception:
+            check_successful = False
 
-    def await_response(self, response_types: Optional[Sequence[str]] = None, response_has_newline: bool = True) \
-            -> Union[tuple[bool, Optional[list]], str]:
+        return check_successful
+
+    def _receive_reply(self, response_has_newline: bool = True) -> tuple[int, int]:
         """
-        Return the response from some command.
+        Receive the next reply into the receive buffer. Anything received after the reply is kept for the next call.
 
-        :param response_types: An optional sequence containing the requested types to cast for response arguments.
-        For example, we would want an integer when reading out a speed
-        :param response_has_newline: A boolean indicating
-        :return: The response from the controller in a list form.
+        :param response_has_newline: See await_response()
+        :return: The start and end index of the reply within the receive buffer.
         """
+        start = self._rx_start
+        end = self._rx_end
+
         while True:
-            if self.stage_port.in_waiting > 0:
-                if not response_has_newline:
-                    response = self.stage_port.read()
+            if response_has_newline:
+                newline_index = self._rx_buf.find(_LF, start, end)
+
+                if newline_index != -1:
+                    reply_end = newline_index + 1
+                    break
+            elif end > start:
+                reply_end = start + 1
+                break
+
+            if end == len(self._rx_buf):
+                if start:
+                    # Move the partial reply to the front of the buffer to make room
+                    self._rx_buf[:end - start] = self._rx_buf[start:end]
+                    end -= start
+                    start = 0
                 else:
-                    response = self.stage_port.readline()
+                    self._rx_buf.extend(bytes(len(self._rx_buf)))
 
-                response = response.decode("ASCII")
+            # Block until at least one byte arrives, and take everything that has already arrived
+            read_size = max(1, min(self.stage_port.in_waiting, len(self._rx_buf) - end))
 
-                # Some commands return a single character response.
-                # These commands do not end with a newline and do not contain a reply character.
-                if not response_has_newline:
-                    return response
+            with memoryview(self._rx_buf) as receive_view:
+                read_count = self._readinto(receive_view[end:end + read_size])
 
-                response_array = response.split(" ")
+            # Only possible when a read timeout has been set in _default_communication_parameters
+            if not read_count:
+                self._rx_start, self._rx_end = start, end
+                raise Exception("Timed out waiting for a response from the controller")
 
-                reply_character = response_array[0]
+            end += read_count
 
-                if reply_character == ":A":
-                    executed_successfully = True
-                elif reply_character == ":N":
-                    executed_successfully = False
-                else:
-                    raise Exception(f"Unknown reply character: {reply_character}")
+        if reply_end == end:
+            self._rx_start = self._rx_end = 0
+        else:
+            self._rx_start, self._rx_end = reply_end, end
 
-                if response_has_newline:
-                    # Remove the reply character from the start of the list and the newline character at the end of
-                    # the list
-                    response_array = response_array[1:-1]
+        return start, reply_end
 
-                if executed_successfully and response_types:
-                    response_array = self._format_response(response_array, response_types)
+    def await_response(self, response_types: Optional[Sequence[str]] = None, response_has_newline: bool = True) \
+            -> Union[tuple[bool, Optional[list]], str]:
+        """
+        Return the response from some command.
+
+        :param response_types: An optional sequence containing the requested types to cast for response arguments.
+        For example, we would want an integer when reading out a speed
+        :param response_has_newline: A boolean indicating
+        :return: The response from the controller in a list form.
+        """
+        start, end = self._receive_reply(response_has_newline)
 
-                return executed_successfully, response_array
+        return _parse_response(self._rx_buf, response_types, response_has_newline, start, end)
 
     def send_check(self, motor_id: str = "X") -> tuple[bool, Optional[list]]:
         """
@@ -120,7 +478,7 @@ class Controller:
         :param motor_id: Which stage dimension to use. Currently, "X" & "Y" are supported.
         :return: See await_response()
         """
-        self.stage_port.write(self._format_command_string(f"RDSTAT {motor_id}"))
+        self._write(_encode_query(_RDSTAT_PREFIX, (motor_id,)))
 
         return self.await_response()
 
@@ -130,9 +488,9 @@ class Controller:
         :return: A bool indicating whether execution was successful,
         as well as a list of speeds from the requested motors.
         """
-        self.stage_port.write(self._format_command_string(f"SPEED {' '.join(motor_ids)}"))
+        self._write(_encode_query(_SPEED_PREFIX, tuple(motor_ids)))
 
-        response_types = ["int"]*len(motor_ids)
+        response_types = _int_response_types(len(motor_ids))
         response = self.await_response(response_types)
 
         return response
@@ -143,9 +501,7 @@ class Controller:
         :return: A bool indicating whether execution was successful.
         The response body is empty for a successful execution.
         """
-        motor_parameters = [f"{motor_id} = {speed}" for motor_id, speed in motor_id_speed_dictionary.items()]
-
-        self.stage_port.write(self._format_command_string(f"SPEED {' '.join(motor_parameters)}"))
+        self._write(_encode_assignment(_SPEED_PREFIX, tuple(motor_id_speed_dictionary.items())))
 
         return self.await_response()
 
@@ -153,9 +509,9 @@ class Controller:
         """
         See get_speed()
         """
-        self.stage_port.write(self._format_command_string(f"ACCEL {' '.join(motor_ids)}"))
+        self._write(_encode_query(_ACCEL_PREFIX, tuple(motor_ids)))
 
-        response_types = ["int"]*len(motor_ids)
+        response_types = _int_response_types(len(motor_ids))
         response = self.await_response(response_types)
 
         return response
@@ -164,9 +520,7 @@ class Controller:
         """
         See set_speed()
         """
-        motor_parameters = [f"{motor_id} = {speed}" for motor_id, speed in motor_id_acceleration_dictionary.items()]
-
-        self.stage_port.write(self._format_command_string(f"ACCEL {' '.join(motor_parameters)}"))
+        self._write(_encode_assignment(_ACCEL_PREFIX, tuple(motor_id_acceleration_dictionary.items())))
 
         return self.await_response()
 
@@ -178,13 +532,39 @@ class Controller:
         :return: A bool indicating whether execution was successful,
         as well as a list of positions from the requested motors.
         """
-        self.stage_port.write(self._format_command_string(f"WHERE {' '.join(motor_ids)}"))
+        self._write(_encode_query(_WHERE_PREFIX, tuple(motor_ids)))
 
-        response_types = ["int"]*len(motor_ids)
+        response_types = _int_response_types(len(motor_ids))
         response = self.await_response(response_types)
 
         return response
     
+    def get_state(self, motor_ids: Sequence[str]) -> tuple[bool, dict[str, list[int]]]:
+        """
+        Read the speed, acceleration and position of the motors at once.
+        The three queries are sent in a single write and their replies are read back in order.
+
+        :param motor_ids: The motors to read from
+        :return: A bool indicating whether every query was successful,
+        as well as a dictionary of the "speed", "accel" and "pos" lists from the requested motors.
+        """
+        motor_ids = tuple(motor_ids)
+
+        self._write(
+            _encode_query(_SPEED_PREFIX, motor_ids)
+            + _encode_query(_ACCEL_PREFIX, motor_ids)
+            + _encode_query(_WHERE_PREFIX, motor_ids)
+        )
+
+        response_types = _int_response_types(len(motor_ids))
+        speed_successful, speeds = self.await_response(response_types)
+        acceleration_successful, accelerations = self.await_response(response_types)
+        position_successful, positions = self.await_response(response_types)
+
+        executed_successfully = speed_successful and acceleration_successful and position_successful
+
+        return executed_successfully, {"speed": speeds, "accel": accelerations, "pos": positions}
+
     def move_absolute(self, motor_id_position_dictionary: dict[str, int]) -> tuple[bool, Optional[list]]:
         """
         Move to the given coordinates in the absolute frame.
@@ -193,9 +573,7 @@ class Controller:
         :return: A bool indicating whether execution was successful.
         The response body is empty for a successful execution.
         """
-        motor_parameters = [f"{motor_id} = {position}" for motor_id, position in motor_id_position_dictionary.items()]
-
-        self.stage_port.write(self._format_command_string(f"MOVE {' '.join(motor_parameters)}"))
+        self._write(_encode_assignment(_MOVE_PREFIX, tuple(motor_id_position_dictionary.items())))
 
         return self.await_response()
 
@@ -207,9 +585,7 @@ class Controller:
         :return: A bool indicating whether execution was successful.
         The response body is empty for a successful execution.
         """
-        motor_parameters = [f"{motor_id} = {position}" for motor_id, position in motor_id_position_dictionary.items()]
-
-        self.stage_port.write(self._format_command_string(f"MOVREL {' '.join(motor_parameters)}"))
+        self._write(_encode_assignment(_MOVREL_PREFIX, tuple(motor_id_position_dictionary.items())))
 
         return self.await_response()
 
@@ -218,20 +594,30 @@ class Controller:
         Returns the status of the motors.
         "B" means the motors are still running and "N" means the motors are free to receive commands.
         """
-        self.stage_port.write(self._format_command_string("STATUS"))
+        self._write(_STATUS_COMMAND)
 
         return self.await_response(response_has_newline=False)
 
-    def await_motors_ready(self) -> None:
+    def await_motors_ready(self, initial_poll_interval: float = 0.005, max_poll_interval: float = 0.1) -> None:
         """
-        Returns when both motors are ready to receive commands
+        Returns when both motors are ready to receive commands.
+        The interval between status checks doubles while the motors are busy so that long moves do not flood the
+        serial line.
+
+        :param initial_poll_interval: The number of seconds to wait after the first busy status
+        :param max_poll_interval: The maximum number of seconds to wait between status checks
         """
+        poll_interval = initial_poll_interval
+
         while True:
             response = self.check_motor_status()
 
             if response == "N":
                 return
 
+            time.sleep(poll_interval)
+            poll_interval = min(poll_interval*2, max_poll_interval)
+
 
 if __name__ == "__main__":
     stage = Controller("COM3")
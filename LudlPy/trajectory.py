@@ -0,0 +1,116 @@
+from collections.abc import Sequence
+import time
+
+from numba import njit
+import numpy as np
+
+from .controller import Controller, _WHERE_PREFIX, _encode_query
+
+
+_COLON = ord(":")
+_ACK = ord("A")
+_SPACE = ord(" ")
+_MINUS = ord("-")
+_ZERO = ord("0")
+_NINE = ord("9")
+_CR = ord("\r")
+_LF = ord("\n")
+# More digits than this may not fit in an int64
+_MAX_DIGITS = 18
+
+
+@njit(cache=True)
+def _parse_where_ascii(response: np.ndarray, positions: np.ndarray) -> int:
+    """
+    Parse the reply to a WHERE command without creating any intermediate Python objects.
+    As with the Cython parser in _ludl_parse.pyx, only replies that _parse_response() would read the same way are
+    accepted: one optionally negative integer per position, each followed by a space, then the line ending.
+
+    :param response: The raw reply as an array of ASCII bytes, e.g. ":A 100 -200 \\r\\n"
+    :param positions: The array to store the parsed positions in
+    :return: The number of positions parsed, or -1 if the controller did not acknowledge the command or the reply is
+    malformed.
+    """
+    length = response.shape[0]
+
+    if length < 3 or response[0] != _COLON or response[1] != _ACK or response[2] != _SPACE:
+        return -1
+
+    index = 3
+
+    for position_index in range(positions.shape[0]):
+        negative = index < length and response[index] == _MINUS
+        if negative:
+            index += 1
+
+        value = 0
+        digit_count = 0
+
+        while index < length and _ZERO <= response[index] <= _NINE:
+            value = value*10 + (np.int64(response[index]) - _ZERO)
+            index += 1
+            digit_count += 1
+
+        if digit_count == 0 or digit_count > _MAX_DIGITS or index >= length or response[index] != _SPACE:
+            return -1
+
+        positions[position_index] = -value if negative else value
+        index += 1
+
+    # Anything but the line ending after the last position would be an extra or malformed value
+    if index >= length or (response[index] != _CR and response[index] != _LF):
+        return -1
+
+    while index < length:
+        if response[index] == _SPACE:
+            return -1
+
+        index += 1
+
+    return positions.shape[0]
+
+
+def record_trajectory(controller: Controller, motor_ids: Sequence[str], sample_hz: float, duration: float) \
+        -> tuple[np.ndarray, np.ndarray]:
+    """
+    Sample the position of the stage at a fixed rate, e.g. while a move is in progress.
+
+    :param controller: The controller to read positions from
+    :param motor_ids: The motors to read the position from
+    :param sample_hz: The number of samples to take per second
+    :param duration: The number of seconds to record for
+    :return: The time of each sample in seconds since recording started,
+    as well as an array of shape (samples, motors) containing the position of each motor.
+    """
+    sample_count = int(sample_hz*duration)
+    sample_period = 1/sample_hz
+
+    times = np.empty(sample_count, np.float64)
+    positions = np.empty((sample_count, len(motor_ids)), np.int64)
+
+    command = _encode_query(_WHERE_PREFIX, tuple(motor_ids))
+    stage_port = controller.stage_port
+    receive_buffer = controller._rx_buf
+
+    start_time = time.perf_counter()
+
+    for sample in range(sample_count):
+        delay = start_time + sample*sample_period - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+        stage_port.write(command)
+        start, end = controller._receive_reply()
+        times[sample] = time.perf_counter() - start_time
+
+        # Parse the reply in place within the controller's receive buffer. The view is released straight away since
+        # the buffer cannot grow while it is exported.
+        response = np.frombuffer(receive_buffer, np.uint8, end - start, start)
+        position_count = _parse_where_ascii(response, positions[sample])
+        del response
+
+        if position_count != len(motor_ids):
+            reply = receive_buffer[start:end].decode("ASCII")
+            raise Exception(f"Unexpected response to position request: {reply}")
+
+    return times, positions
@@ -1,5 +1,21 @@
 import setuptools
 
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    # Without Cython the package falls back to parsing replies in pure Python
+    ext_modules = []
+else:
+    ext_modules = cythonize(
+        [
+            setuptools.Extension(
+                "LudlPy._ludl_parse", ["LudlPy/_ludl_parse.pyx"], extra_compile_args=["-O3"], optional=True
+            )
+        ],
+        language_level=3,
+    )
+
+
 setuptools.setup(
     name="LudlPy",
     version="0.0.1",
@@ -12,5 +28,10 @@ setuptools.setup(
     },
     license="MIT",
     packages=setuptools.find_packages(),
-    install_requires=["pyserial"],
+    ext_modules=ext_modules,
+    install_requires=["pyserial>=3.3"],
+    extras_require={
+        "async": ["pyserial-asyncio"],
+        "trajectory": ["numpy", "numba"],
+    },
 )
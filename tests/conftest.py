@@ -0,0 +1,206 @@
+import asyncio
+
+import pytest
+
+from LudlPy import controller
+
+
+class FakeLudl:
+    """
+    The controller at the far end of a FakeSerial port. Bytes sent at a baud rate other than the controller's are
+    lost, and replies sent at another rate arrive garbled.
+    """
+
+    def __init__(self, baudrate=9600, max_baudrate=115200, ack_baud_at_new_rate=False):
+        self.baudrate = baudrate
+        self.max_baudrate = max_baudrate
+        self.ack_baud_at_new_rate = ack_baud_at_new_rate
+        self.commands = []
+        self.values = {"SPEED": {"X": 10, "Y": 20}, "ACCEL": {"X": 1, "Y": 2}, "WHERE": {"X": 100, "Y": -200}}
+        self._line = b""
+
+    def receive(self, data, baudrate):
+        """
+        :return: The bytes received by the other end, which is at the given baud rate
+        """
+        if baudrate != self.baudrate:
+            return b""
+
+        self._line += data
+        output = b""
+
+        while b"\r" in self._line:
+            command, self._line = self._line.split(b"\r", 1)
+            output += self._execute(command.decode("ASCII"), baudrate)
+
+        return output
+
+    def _execute(self, command, baudrate):
+        self.commands.append(command)
+        name, *arguments = command.split()
+
+        if name == "BAUD":
+            if int(arguments[0]) > self.max_baudrate:
+                return self._send(b":N -4 \r\n", baudrate)
+
+            if self.ack_baud_at_new_rate:
+                self.baudrate = int(arguments[0])
+                return self._send(b":A \r\n", baudrate)
+
+            reply = self._send(b":A \r\n", baudrate)
+            self.baudrate = int(arguments[0])
+            return reply
+
+        if name == "RDSTAT":
+            return self._send(b":A 1 2 3 \r\n", baudrate)
+
+        if name == "STATUS":
+            return self._send(b"N", baudrate)
+
+        if name in self.values:
+            if "=" in arguments:
+                for motor_id, value in zip(arguments[::3], arguments[2::3]):
+                    self.values[name][motor_id] = int(value)
+
+                return self._send(b":A \r\n", baudrate)
+
+            values = " ".join(str(self.values[name][motor_id]) for motor_id in arguments)
+            return self._send(f":A {values} \r\n".encode("ASCII"), baudrate)
+
+        if name in ("MOVE", "MOVREL"):
+            return self._send(b":A \r\n", baudrate)
+
+        return self._send(b":N -1 \r\n", baudrate)
+
+    def _send(self, reply, baudrate):
+        if baudrate != self.baudrate:
+            return b"\xff"*(len(reply)//2)
+
+        return reply
+
+
+class FakeSerial:
+    """
+    Stands in for serial.Serial, connected to the FakeLudl registered under the port name.
+    """
+
+    controllers = {}
+
+    def __init__(self, port, baudrate=9600, timeout=None, **_):
+        self.controller = self.controllers[port]
+        self.baudrate = baudrate
+        self.timeout = timeout
+        self.writes = []
+        self._received = bytearray()
+
+    @property
+    def in_waiting(self):
+        return len(self._received)
+
+    def write(self, data):
+        self.writes.append(bytes(data))
+        self._received += self.controller.receive(bytes(data), self.baudrate)
+
+        return len(data)
+
+    def readinto(self, buffer):
+        if not self._received:
+            if self.timeout is None:
+                raise AssertionError("The read would block forever")
+
+            return 0
+
+        read_count = min(len(buffer), len(self._received))
+        buffer[:read_count] = self._received[:read_count]
+        del self._received[:read_count]
+
+        return read_count
+
+    def reset_input_buffer(self):
+        self._received.clear()
+
+    def close(self):
+        pass
+
+
+class FakeStream:
+    """
+    Stands in for the asyncio stream reader and writer of an AsyncController, connected to a FakeLudl.
+    """
+
+    def __init__(self, device):
+        self.device = device
+        self.writes = []
+        self.closed = False
+        # Set to an exception to lose the replies to the next write and raise it from the read waiting on them
+        self.fail_next_read = None
+        self._received = bytearray()
+        self._read_exception = None
+        self._data_received = asyncio.Event()
+
+    def write(self, data):
+        if self.closed:
+            raise RuntimeError("The stream is closed")
+
+        self.writes.append(bytes(data))
+        replies = self.device.receive(bytes(data), self.device.baudrate)
+
+        if self.fail_next_read is not None:
+            self._read_exception, self.fail_next_read = self.fail_next_read, None
+        else:
+            self._received += replies
+
+        self._data_received.set()
+
+    async def _read(self, size):
+        while True:
+            if self._read_exception is not None:
+                exception, self._read_exception = self._read_exception, None
+                raise exception
+
+            read_count = size(self._received)
+            if read_count:
+                data = bytes(self._received[:read_count])
+                del self._received[:read_count]
+                return data
+
+            self._data_received.clear()
+            await self._data_received.wait()
+
+    async def readline(self):
+        return await self._read(lambda received: received.find(b"\n") + 1)
+
+    async def readexactly(self, n):
+        return await self._read(lambda received: n if len(received) >= n else 0)
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_port(monkeypatch, tmp_path):
+    """
+    Route serial ports opened by LudlPy to FakeSerial, with the baud rate cache kept in a temporary directory.
+
+    :return: A function registering a FakeLudl under a port name
+    """
+    monkeypatch.setattr(controller.serial, "Serial", FakeSerial)
+    monkeypatch.setattr(controller, "_baudrate_cache_path", str(tmp_path / "ludlpy_baud"))
+    monkeypatch.setattr(FakeSerial, "controllers", {})
+
+    def connect(port, **kwargs):
+        FakeSerial.controllers[port] = FakeLudl(**kwargs)
+        return FakeSerial.controllers[port]
+
+    return connect
+
+
+@pytest.fixture
+def fake_stream():
+    """
+    :return: A function connecting a FakeStream to a new FakeLudl. It must be called while the event loop is running.
+    """
+    def connect(**kwargs):
+        return FakeStream(FakeLudl(**kwargs))
+
+    return connect
@@ -0,0 +1,92 @@
+import asyncio
+
+from LudlPy.async_controller import AsyncController
+
+
+def test_concurrent_commands_are_written_in_one_frame(fake_stream):
+    async def run():
+        stream = fake_stream()
+        stage = AsyncController(stream, stream)
+
+        responses = await asyncio.gather(
+            stage.get_speed(["X", "Y"]), stage.set_acceleration({"Y": 3}), stage.get_absolute_position(["X", "Y"]),
+            stage.get_acceleration(["Y"])
+        )
+
+        return stream, responses
+
+    stream, responses = asyncio.run(run())
+
+    assert stream.writes == [b"SPEED X Y\rACCEL Y = 3\rWHERE X Y\r", b"ACCEL Y\r"]
+    assert responses == [(True, [10, 20]), (True, []), (True, [100, -200]), (True, [3])]
+
+
+def test_state_replies_received_back_to_back(fake_stream):
+    async def run():
+        stream = fake_stream()
+        stage = AsyncController(stream, stream)
+
+        return stream, await stage.get_state(["X", "Y"])
+
+    stream, state = asyncio.run(run())
+
+    assert stream.writes == [b"SPEED X Y\rACCEL X Y\rWHERE X Y\r"]
+    assert state == (True, {"speed": [10, 20], "accel": [1, 2], "pos": [100, -200]})
+
+
+def test_read_failure_only_fails_written_commands(fake_stream):
+    async def run():
+        stream = fake_stream()
+        stage = AsyncController(stream, stream)
+        stream.fail_next_read = OSError("device unplugged")
+
+        # The position query is written straight away, the speed query is still waiting for the next flush
+        written = asyncio.ensure_future(stage.get_absolute_position(["X"]))
+        await asyncio.sleep(0)
+        pending = asyncio.ensure_future(stage.get_speed(["X"]))
+
+        return await asyncio.gather(written, pending, return_exceptions=True)
+
+    written_response, pending_response = asyncio.run(run())
+
+    assert isinstance(written_response, OSError)
+    assert pending_response == (True, [10])
+
+
+def test_failed_write_fails_its_batch(fake_stream):
+    async def run():
+        stream = fake_stream()
+        stage = AsyncController(stream, stream)
+        stream.close()
+
+        responses = await asyncio.wait_for(
+            asyncio.gather(stage.set_speed({"X": 5}), stage.get_speed(["X"]), return_exceptions=True), 1
+        )
+
+        return stage, responses
+
+    stage, responses = asyncio.run(run())
+
+    assert all(isinstance(response, RuntimeError) for response in responses)
+    assert not stage.command_queue._pending
+
+
+def test_close_fails_outstanding_commands(fake_stream):
+    async def run():
+        stream = fake_stream()
+        stage = AsyncController(stream, stream)
+
+        # The position query is written and waiting for its reply, the others are waiting for the next flush
+        commands = [
+            asyncio.ensure_future(stage.set_speed({"X": 5})), asyncio.ensure_future(stage.get_speed(["X"])),
+            asyncio.ensure_future(stage.get_absolute_position(["X"]))
+        ]
+        await asyncio.sleep(0)
+        stage.close()
+
+        return await asyncio.wait_for(asyncio.gather(*commands, return_exceptions=True), 1)
+
+    responses = asyncio.run(run())
+
+    assert len(responses) == 3
+    assert all(isinstance(response, ConnectionError) for response in responses)
@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from LudlPy import controller
+
+
+def _cached_baudrates():
+    with open(controller._baudrate_cache_path) as cache_file:
+        return json.load(cache_file)
+
+
+@pytest.mark.parametrize("ack_baud_at_new_rate", [False, True])
+def test_switches_to_fastest_accepted_rate(fake_port, ack_baud_at_new_rate):
+    device = fake_port("COM5", max_baudrate=57600, ack_baud_at_new_rate=ack_baud_at_new_rate)
+
+    stage = controller.Controller("COM5", target_baud=115200)
+
+    assert stage.stage_port.baudrate == device.baudrate == 57600
+    assert stage.stage_port.timeout is None
+    assert _cached_baudrates() == {"COM5": 57600}
+    assert stage.get_speed("X") == (True, [10])
+
+
+def test_steps_down_to_target(fake_port):
+    device = fake_port("COM5", baudrate=115200)
+
+    stage = controller.Controller("COM5", target_baud=19200)
+
+    assert stage.stage_port.baudrate == device.baudrate == 19200
+    assert _cached_baudrates() == {"COM5": 19200}
+
+
+def test_plain_connection_uses_cached_rate(fake_port):
+    device = fake_port("COM5")
+    controller.Controller("COM5", target_baud=57600)
+
+    stage = controller.Controller("COM5")
+
+    assert stage.stage_port.baudrate == device.baudrate == 57600
+    assert stage.get_speed("X") == (True, [10])
+
+
+def test_stale_cache_is_corrected(fake_port):
+    fake_port("COM5")
+    controller._save_cached_baudrate("COM5", 115200)
+
+    stage = controller.Controller("COM5")
+
+    assert stage.stage_port.baudrate == 9600
+    assert _cached_baudrates() == {"COM5": 9600}
+
+
+def test_unresponsive_controller_raises_without_caching(fake_port):
+    fake_port("COM5", baudrate=4800)
+    controller._save_cached_baudrate("COM5", 57600)
+
+    with pytest.raises(Exception, match="did not answer"):
+        controller.Controller("COM5", target_baud=115200)
+
+    assert _cached_baudrates() == {"COM5": 57600}
@@ -0,0 +1,33 @@
+import pytest
+
+from LudlPy import controller
+
+
+def test_state_replies_received_back_to_back(fake_port):
+    fake_port("COM5")
+    stage = controller.Controller("COM5", baudrate=9600)
+
+    assert stage.get_state(["X", "Y"]) == (True, {"speed": [10, 20], "accel": [1, 2], "pos": [100, -200]})
+    assert stage.stage_port.writes == [b"SPEED X Y\rACCEL X Y\rWHERE X Y\r"]
+    assert stage._rx_start == stage._rx_end == 0
+
+
+@pytest.mark.parametrize("buffer_size", [1, 4, 16])
+def test_replies_carried_over_in_small_receive_buffer(fake_port, buffer_size):
+    fake_port("COM5")
+    stage = controller.Controller("COM5", baudrate=9600)
+    stage._rx_buf = bytearray(buffer_size)
+
+    for _ in range(3):
+        assert stage.get_state(["X", "Y"]) == (True, {"speed": [10, 20], "accel": [1, 2], "pos": [100, -200]})
+
+
+def test_single_character_reply_after_line_reply(fake_port):
+    fake_port("COM5")
+    stage = controller.Controller("COM5", baudrate=9600)
+
+    stage.stage_port.write(b"WHERE X\rSTATUS\r")
+
+    assert stage.await_response(controller._int_response_types(1)) == (True, [100])
+    assert stage.await_response(response_has_newline=False) == "N"
+    assert stage._rx_start == stage._rx_end == 0
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from LudlPy import controller
+
+_ludl_parse = pytest.importorskip("LudlPy._ludl_parse")
+
+
+def _parse_in_python(response, response_types):
+    """
+    Parse with the pure Python parser, returning the raised exception type instead of raising it.
+    """
+    parse_int_response = controller._parse_int_response
+    controller._parse_int_response = None
+
+    try:
+        return controller._parse_response(response, response_types)
+    except Exception as exception:
+        return type(exception)
+    finally:
+        controller._parse_int_response = parse_int_response
+
+
+@pytest.mark.parametrize("response", [b":A 12 abc \r\n", b":A 12 3.5 \r\n", b":A 12 3 \r\n", b":A 12\r\n"])
+def test_malformed_replies_are_left_to_the_python_parser(response):
+    assert _ludl_parse.parse_int_response(response, 0, len(response), 1) is None
+
+
+def test_compiled_parser_matches_python_parser():
+    generator = random.Random(0)
+    alphabet = b":AN -0123456789.+_x\r\n"
+
+    for _ in range(200000):
+        argument_count = generator.randint(1, 3)
+        response_types = controller._int_response_types(argument_count)
+
+        if generator.random() < 0.5:
+            arguments = b" ".join(str(generator.randint(-10**6, 10**6)).encode() for _ in range(argument_count))
+            response = b":A " + arguments + b" \r\n"
+            position = generator.randrange(len(response))
+            response = response[:position] + bytes([generator.choice(alphabet)]) + response[position + 1:]
+        else:
+            response = b":A " + bytes(generator.choice(alphabet) for _ in range(generator.randint(0, 12)))
+
+        compiled = _ludl_parse.parse_int_response(response, 0, len(response), argument_count)
+
+        if compiled is not None:
+            assert _parse_in_python(response, response_types) == (True, compiled), response
@@ -0,0 +1,64 @@
+import random
+
+import pytest
+
+from LudlPy import controller
+
+np = pytest.importorskip("numpy")
+trajectory = pytest.importorskip("LudlPy.trajectory")
+
+
+def _parse_in_kernel(response, motor_count):
+    positions = np.zeros(motor_count, np.int64)
+    position_count = trajectory._parse_where_ascii(np.frombuffer(response, np.uint8), positions)
+
+    return position_count, positions.tolist()
+
+
+def _parse_in_python(response, motor_count):
+    """
+    Parse with _parse_response(), returning the raised exception type instead of raising it.
+    """
+    try:
+        return controller._parse_response(response, controller._int_response_types(motor_count))
+    except Exception as exception:
+        return type(exception)
+
+
+@pytest.mark.parametrize("response", [b":A 12 34 \r\n", b":A 12abc \r\n", b":A 12\r\n", b":A 12 \r \n", b":N -1 \r\n"])
+def test_malformed_replies_are_rejected(response):
+    assert _parse_in_kernel(response, 1)[0] == -1
+
+
+def test_positions_outside_int32_range():
+    assert _parse_in_kernel(b":A 3000000000 -3000000000 \r\n", 2) == (2, [3000000000, -3000000000])
+
+
+def test_kernel_matches_python_parser():
+    generator = random.Random(0)
+    alphabet = b":AN -0123456789.+_x\r\n"
+
+    for _ in range(100000):
+        motor_count = generator.randint(1, 3)
+        positions = b" ".join(str(generator.randint(-10**10, 10**10)).encode() for _ in range(motor_count))
+        response = b":A " + positions + b" \r\n"
+
+        if generator.random() < 0.75:
+            index = generator.randrange(len(response))
+            response = response[:index] + bytes([generator.choice(alphabet)]) + response[index + 1:]
+
+        position_count, parsed_positions = _parse_in_kernel(response, motor_count)
+
+        if position_count != -1:
+            assert position_count == motor_count
+            assert _parse_in_python(response, motor_count) == (True, parsed_positions), response
+
+
+def test_record_trajectory(fake_port):
+    fake_port("COM5")
+    stage = controller.Controller("COM5", baudrate=9600)
+
+    times, positions = trajectory.record_trajectory(stage, ["X", "Y"], 1000, 0.01)
+
+    assert times.shape == (10,)
+    assert positions.tolist() == [[100, -200]]*10